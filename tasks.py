@@ -98,13 +98,15 @@ def unit_test(c: Context, cov: bool = False) -> None:
 
 
 @task
-def integration_test(c: Context, cov: bool = False) -> None:
+def integration_test(c: Context, cov: bool = False, slow: bool = False) -> None:
     r"""Run the unit tests."""
     cmd = ["python -m pytest --xdoctest --timeout 60"]
     if cov:
         cmd.append(
             f"--cov-report html --cov-report xml --cov-report term  --cov-append --cov={NAME}"
         )
+    if slow:
+        cmd.append('-m ""')
     cmd.append(f"{INTEGRATION_TESTS}")
     c.run(" ".join(cmd), pty=True)
 
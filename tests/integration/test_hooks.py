@@ -1,23 +1,30 @@
 from __future__ import annotations
 
 import subprocess
+import sys
 import zipfile
+from contextlib import contextmanager
 from typing import TYPE_CHECKING
 
 import pytest
+from hatchling.build import build_wheel
+from hatchling.metadata.core import ProjectMetadata
+from hatchling.metadata.spec import (
+    DEFAULT_METADATA_VERSION,
+    get_core_metadata_constructors,
+)
+from hatchling.plugin.manager import PluginManager
 
 if TYPE_CHECKING:
+    from collections.abc import Iterator
     from pathlib import Path
 
+METADATA_PATH = "testpkg-0.1.0.dist-info/METADATA"
+# Large read buffer so the central directory is parsed with few syscalls
+READ_BUFFER_SIZE = 1024 * 1024
 
-def build_minimal_project(path: Path) -> None:
-    r"""Create a minimal project.
-
-    Args:
-        path: The path where to build the minimal project.
-    """
-    path.joinpath("pyproject.toml").write_text(
-        """[build-system]
+# Content of the files of the minimal project
+PYPROJECT = b"""[build-system]
 requires = ["hatchling", "hatchling-autoextras-hook"]
 build-backend = "hatchling.build"
 
@@ -37,16 +44,68 @@ requires-python = ">=3.10"
 [project.optional-dependencies]
 numpy = [ "numpy>=2.0" ]
 dev = [ "pytest>=9.0" ]
-""",
-        encoding="utf-8",
-    )
+"""
+README = b"Test package"
+
+REQUIRED_METADATA_LINES = frozenset(
+    {
+        "Provides-Extra: all",
+        "Requires-Dist: numpy>=2.0; extra == 'all'",
+        "Requires-Dist: pytest>=9.0; extra == 'all'",
+        # Also ensure original extras still exist
+        "Provides-Extra: numpy",
+        "Provides-Extra: dev",
+    }
+)
+
+VALID_METADATA = r"""Metadata-Version: 2.4
+Name: testpkg
+Version: 0.1.0
+Dynamic: Maintainer
+Dynamic: Maintainer-email
+Summary: Test project
+Requires-Python: >=3.10
+Provides-Extra: all
+Requires-Dist: numpy>=2.0; extra == 'all'
+Requires-Dist: pytest>=9.0; extra == 'all'
+Provides-Extra: dev
+Requires-Dist: pytest>=9.0; extra == 'dev'
+Provides-Extra: numpy
+Requires-Dist: numpy>=2.0; extra == 'numpy'
+Description-Content-Type: text/markdown
+"""
+
+INVALID_METADATA = r"""Metadata-Version: 2.4
+Name: testpkg
+Version: 0.1.0
+Dynamic: Maintainer
+Dynamic: Maintainer-email
+Summary: Test project
+Requires-Python: >=3.10
+Provides-Extra: dev
+Requires-Dist: pytest>=9.0; extra == 'dev'
+Provides-Extra: numpy
+Requires-Dist: numpy>=2.0; extra == 'numpy'
+Description-Content-Type: text/markdown
+"""
 
-    path.joinpath("README.md").write_text("Test package", encoding="utf-8")
+
+def build_minimal_project(path: Path) -> None:
+    r"""Create a minimal project.
+
+    Args:
+        path: The path where to build the minimal project. It must
+            be an existing empty directory.
+    """
+    path.joinpath("pyproject.toml").write_bytes(PYPROJECT)
+    path.joinpath("README.md").write_bytes(README)
 
     # Minimal module
-    path_pkg = path.joinpath("src").joinpath("testpkg")
-    path_pkg.mkdir(exist_ok=True, parents=True)
-    path_pkg.joinpath("__init__.py").write_text("", encoding="utf-8")
+    path_src = path.joinpath("src")
+    path_src.mkdir()
+    path_pkg = path_src.joinpath("testpkg")
+    path_pkg.mkdir()
+    path_pkg.joinpath("__init__.py").touch()
 
 
 def find_wheel_path(path: Path) -> Path:
@@ -59,26 +118,66 @@ def find_wheel_path(path: Path) -> Path:
         The wheel path.
     """
     dist_dir = path.joinpath("dist")
-    wheels = list(dist_dir.glob("*.whl"))
-    assert len(wheels) == 1, "Expected exactly one wheel"
-    return wheels[0]
+    assert dist_dir.is_dir(), "dist/ directory not found"
+    wheels = (p for p in dist_dir.iterdir() if p.suffix == ".whl")
+    wheel = next(wheels, None)
+    assert wheel is not None, "No wheel found in dist/"
+    assert next(wheels, None) is None, "More than one wheel in dist/"
+    return wheel
+
 
+def render_metadata(path: Path) -> str:
+    r"""Render the core metadata of a project without building it.
+
+    The metadata hooks are resolved by hatchling exactly like during a
+    build, and the METADATA content is generated with the same
+    constructor as the one used to write the wheel.
+
+    Args:
+        path: The project path.
+
+    Returns:
+        The content of the METADATA file.
+    """
+    metadata = ProjectMetadata(str(path), PluginManager())
+    return get_core_metadata_constructors()[DEFAULT_METADATA_VERSION](metadata)
+
+
+@contextmanager
+def open_wheel(path: Path) -> Iterator[zipfile.ZipFile]:
+    r"""Open a wheel through a buffered reader to limit the number of
+    small reads.
+
+    Args:
+        path: The path to the wheel.
 
-def read_metadata(path: Path) -> str:
+    Yields:
+        The opened wheel.
+    """
+    with path.open("rb", buffering=READ_BUFFER_SIZE) as fh, zipfile.ZipFile(fh) as zf:
+        yield zf
+
+
+def read_metadata(zf: zipfile.ZipFile) -> str:
     r"""Inspect wheel metadata, find the METADATA file inside the wheel,
     and read the content.
 
+    The METADATA file is read directly from its expected location in
+    the ``.dist-info`` directory, and the central directory is only
+    scanned if it is not there.
+
     Args:
-        path: The path to the wheel.
+        zf: The opened wheel.
 
     Returns:
         The content of the METADATA file.
     """
-    with zipfile.ZipFile(path) as zf:
-        namelist = zf.namelist()
-        metadata_files = [n for n in namelist if n.endswith("METADATA")]
-        assert metadata_files, "METADATA file not found in wheel"
-        return zf.read(metadata_files[0]).decode()
+    try:
+        return zf.read(METADATA_PATH).decode("utf-8")
+    except KeyError:
+        info = next((i for i in zf.infolist() if i.filename.endswith(".dist-info/METADATA")), None)
+        assert info is not None, "METADATA file not found in wheel"
+        return zf.read(info).decode("utf-8")
 
 
 def validate_metadata(metadata: str) -> None:
@@ -87,42 +186,76 @@ def validate_metadata(metadata: str) -> None:
     Args:
         metadata: The content of the metadata file.
     """
-    assert "Provides-Extra: all" in metadata
-    assert "Requires-Dist: numpy>=2.0; extra == 'all'" in metadata
-    assert "Requires-Dist: pytest>=9.0; extra == 'all'" in metadata
+    missing = REQUIRED_METADATA_LINES.difference(metadata.splitlines())
+    assert not missing, f"Missing metadata lines: {sorted(missing)}"
+
+
+@pytest.fixture(scope="session")
+def project_path(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    r"""Create the minimal project once per session and return its
+    path.
+
+    The project is shared by all the tests so it must not be modified.
+    """
+    path = tmp_path_factory.mktemp("project")
+    build_minimal_project(path)
+    return path
+
+
+@pytest.fixture(scope="session")
+def built_wheel(tmp_path_factory: pytest.TempPathFactory, project_path: Path) -> Path:
+    r"""Build the minimal project once per session and return the path
+    to the generated wheel.
+
+    The wheel is shared by all the tests so it must not be modified.
+    """
+    # Build the wheel in-process with the hatchling PEP 517 backend.
+    # hatchling reads the project from the current working directory.
+    dist_dir = tmp_path_factory.mktemp("dist")
+    with pytest.MonkeyPatch.context() as mp:
+        mp.chdir(project_path)
+        wheel_name = build_wheel(str(dist_dir))
+    return dist_dir.joinpath(wheel_name)
 
-    # Also ensure original extras still exist
-    assert "Provides-Extra: numpy" in metadata
-    assert "Provides-Extra: dev" in metadata
 
+@pytest.fixture(scope="session")
+def wheel_zip(built_wheel: Path) -> Iterator[zipfile.ZipFile]:
+    r"""Open the session wheel once and share the handle so the central
+    directory is only parsed once.
 
-def test_autoextras_integration(tmp_path: Path) -> None:
+    The handle is shared by all the tests so it must not be closed.
+    """
+    with open_wheel(built_wheel) as zf:
+        yield zf
+
+
+def test_autoextras_integration(project_path: Path) -> None:
+    r"""Resolve the metadata of a temporary Python project using
+    hatchling with the autoextras plugin and verify that it contains an
+    'all' extra that merges all optional dependencies."""
+    validate_metadata(render_metadata(project_path))
+
+
+@pytest.mark.slow
+def test_autoextras_integration_wheel(wheel_zip: zipfile.ZipFile) -> None:
     r"""Build a temporary Python project using hatchling with the
     autoextras plugin and verify that the generated wheel contains an
     'all' extra that merges all optional dependencies."""
-    path = tmp_path.joinpath("project")
-    path.mkdir(exist_ok=True, parents=True)
+    validate_metadata(read_metadata(wheel_zip))
 
-    # ----------------------------------------------------------------------
-    # 1. Create a minimal project that uses the autoextras metadata hook
-    # ----------------------------------------------------------------------
-    build_minimal_project(path)
-    # ----------------------------------------------------------------------
-    # 2. Build the wheel using uv build
-    # ----------------------------------------------------------------------
-    subprocess.run(["uv", "build"], cwd=path, check=True)  # noqa: S607
-    # ----------------------------------------------------------------------
-    # 3. Find the generated wheel in dist/
-    # ----------------------------------------------------------------------
-    wheel_path = find_wheel_path(path)
-    # ----------------------------------------------------------------------
-    # 4. Inspect wheel metadata (METADATA file inside the .whl)
-    # ----------------------------------------------------------------------
-    metadata = read_metadata(wheel_path)
-    # ----------------------------------------------------------------------
-    # 5. Validate that the 'all' extra was automatically generated
-    # ----------------------------------------------------------------------
-    validate_metadata(metadata)
+
+@pytest.mark.slow
+def test_autoextras_integration_uv_build(tmp_path: Path) -> None:
+    r"""Build a temporary Python project with ``uv build`` and verify
+    that the generated wheel contains an 'all' extra that merges all
+    optional dependencies."""
+    build_minimal_project(tmp_path)
+    # Reuse hatchling and the hook installed in the current interpreter
+    # instead of provisioning an isolated build environment.
+    cmd = ["uv", "build", "--no-build-isolation", "--python", sys.executable]
+    subprocess.run(cmd, cwd=tmp_path, check=True)  # noqa: S603
+    with open_wheel(find_wheel_path(tmp_path)) as zf:
+        validate_metadata(read_metadata(zf))
 
 
 #######################################
@@ -130,44 +263,17 @@ def test_autoextras_integration(tmp_path: Path) -> None:
 #######################################
 
 
-def test_validate_metadata_valid() -> None:
-    metadata = r"""Metadata-Version: 2.4
-Name: testpkg
-Version: 0.1.0
-Dynamic: Maintainer
-Dynamic: Maintainer-email
-Summary: Test project
-Requires-Python: >=3.10
-Provides-Extra: all
-Requires-Dist: numpy>=2.0; extra == 'all'
-Requires-Dist: pytest>=9.0; extra == 'all'
-Provides-Extra: dev
-Requires-Dist: pytest>=9.0; extra == 'dev'
-Provides-Extra: numpy
-Requires-Dist: numpy>=2.0; extra == 'numpy'
-Description-Content-Type: text/markdown
-"""
-    validate_metadata(metadata)
-
-
-def test_validate_metadata_invalid() -> None:
-    metadata = r"""Metadata-Version: 2.4
-Name: testpkg
-Version: 0.1.0
-Dynamic: Maintainer
-Dynamic: Maintainer-email
-Summary: Test project
-Requires-Python: >=3.10
-Provides-Extra: dev
-Requires-Dist: pytest>=9.0; extra == 'dev'
-Provides-Extra: numpy
-Requires-Dist: numpy>=2.0; extra == 'numpy'
-Description-Content-Type: text/markdown
-"""
-    with pytest.raises(AssertionError):
+@pytest.mark.parametrize(
+    ("metadata", "valid"),
+    [
+        pytest.param(VALID_METADATA, True, id="valid"),
+        pytest.param(INVALID_METADATA, False, id="invalid"),
+        pytest.param("", False, id="empty"),
+    ],
+)
+def test_validate_metadata(metadata: str, valid: bool) -> None:
+    if valid:
         validate_metadata(metadata)
-
-
-def test_validate_metadata_empty() -> None:
-    with pytest.raises(AssertionError):
-        validate_metadata("")
+    else:
+        with pytest.raises(AssertionError):
+            validate_metadata(metadata)